@@ -0,0 +1,86 @@
+"""
+Maintains the punctuality leaderboard ordering as user statistics change.
+
+Instead of re-sorting every user's stats on each leaderboard request, this
+module keeps the ranking up to date incrementally. Each change to a user's
+stats repositions only that user, and reading the board is a slice of an
+already sorted list.
+"""
+
+from bisect import bisect_left, insort
+
+from domain.models import UserStats
+
+RankKey = tuple[int, float, int, int]
+
+
+def rank_key(stats: UserStats) -> RankKey:
+    """
+    Return the sort key that orders users on the leaderboard.
+
+    Users are ranked by fewest no-shows, then highest on-time percentage,
+    then lowest average lateness. The user ID is the final element so that
+    every key is unique and can be mapped back to its user.
+    """
+    return (
+        stats.no_shows,
+        -stats.on_time_percentage,
+        stats.average_lateness_seconds,
+        stats.user_id,
+    )
+
+
+class LeaderboardIndex:
+    """An in-memory index of user stats kept sorted by leaderboard rank."""
+
+    def __init__(self):
+        """Initialize an empty index that has not yet been loaded."""
+        self._keys: list[RankKey] = []
+        self._entries: dict[int, tuple[RankKey, UserStats]] = {}
+        self.loaded = False
+
+    def load(self, all_stats: dict[int, UserStats]):
+        """
+        Rebuild the index from a complete set of user stats.
+
+        An empty set leaves the index unloaded, because the stats repository
+        also returns no stats when its file could not be read. The next
+        leaderboard request then reads the stats again.
+
+        Args:
+            all_stats: Every user's stats, keyed by user ID.
+        """
+        self._entries = {uid: (rank_key(s), s) for uid, s in all_stats.items()}
+        self._keys = sorted(key for key, _ in self._entries.values())
+        self.loaded = bool(all_stats)
+
+    def update(self, stats: UserStats):
+        """
+        Insert a user's stats, or move them to their new rank after a change.
+
+        Updates received before the index is loaded are ignored, since the
+        initial load reads the already-saved stats.
+
+        Args:
+            stats: The user's updated statistics.
+        """
+        if not self.loaded:
+            return
+        previous = self._entries.get(stats.user_id)
+        if previous is not None:
+            del self._keys[bisect_left(self._keys, previous[0])]
+        key = rank_key(stats)
+        insort(self._keys, key)
+        self._entries[stats.user_id] = (key, stats)
+
+    def top(self, limit: int | None = None) -> list[UserStats]:
+        """
+        Return indexed user stats in leaderboard order.
+
+        Args:
+            limit: The maximum number of users to return, or None for all.
+        """
+        if not self._keys:
+            return []
+        keys = self._keys if limit is None else self._keys[:limit]
+        return [self._entries[key[-1]][1] for key in keys]
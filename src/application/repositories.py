@@ -22,13 +22,17 @@ class SessionRepository(Protocol):
         ...
 
     async def save_session(self, session: Session) -> None:
-        """Save the given session state to storage."""
+        """Save the given session state to storage, possibly after a short delay."""
         ...
 
     async def clear_session(self) -> None:
         """Clear the active session from storage."""
         ...
 
+    async def flush(self) -> None:
+        """Write any session changes that are still buffered to storage."""
+        ...
+
 
 @runtime_checkable
 class StatsRepository(Protocol):
@@ -6,17 +6,31 @@ the domain layer. It contains the high-level logic for each user-facing
 feature, such as recording ETAs, handling arrivals, and calculating stats.
 """
 
+import asyncio
 import logging
-from datetime import time, timedelta
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
 from typing import Union, List
 
 from domain.models import Session, UserETA, UserStatus, UserStats, get_aware_now
+from application.leaderboard import LeaderboardIndex
 from application.repositories import SessionRepository, StatsRepository
 
 
 log = logging.getLogger(__name__)
 
 
+@dataclass
+class SessionTick:
+    """The outcome of one periodic check of the active session."""
+
+    newly_late: List[UserETA] = field(default_factory=list)
+    expired: List[UserETA] = field(default_factory=list)
+    # Unix epoch seconds at which the session next needs checking, if ever.
+    next_due: Union[float, None] = None
+
+
 class ReadyUpService:
     """Orchestrates all application logic for the ReadyUp bot."""
 
@@ -30,10 +44,50 @@ class ReadyUpService:
         """
         self.session_repo = session_repo
         self.stats_repo = stats_repo
+        self._leaderboard = LeaderboardIndex()
+        self._leaderboard_lock = asyncio.Lock()
+        # Write-through cache of the active session. It is loaded from the
+        # repository once and then kept current by this service's own writes.
+        self._session_cache: Session | None = None
+        self._session_loaded = False
+        self._session_lock = asyncio.Lock()
+        # Held for the whole of each use case that changes the session, so
+        # that a command and the background tick never interleave their
+        # session and stats updates across awaits.
+        self._update_lock = asyncio.Lock()
         log.info("ReadyUpService initialized.")
 
-    async def _get_or_create_user_stats(
-        self, user_id: int, user_name: str
+    async def close(self):
+        """Write any session changes the repository is still holding."""
+        await self.session_repo.flush()
+
+    async def _load_session(self) -> Session | None:
+        """
+        Return the active session from the in-memory cache.
+
+        Storage is only read the first time; afterwards every command and
+        background tick shares the same Session object.
+        """
+        if not self._session_loaded:
+            async with self._session_lock:
+                if not self._session_loaded:
+                    self._session_cache = await self.session_repo.get_session()
+                    self._session_loaded = True
+        return self._session_cache
+
+    async def _save_session(self, session: Session):
+        """
+        Update the cached session and pass it to the repository to be saved.
+
+        Args:
+            session: The session state that should be persisted.
+        """
+        self._session_cache = session
+        self._session_loaded = True
+        await self.session_repo.save_session(session)
+
+    def _get_or_create_user_stats(
+        self, user_id: int, user_name: str, all_stats: dict[int, UserStats]
     ) -> UserStats:
         """
         Fetch a user's stats, creating a new record if one doesn't exist.
@@ -44,16 +98,25 @@ class ReadyUpService:
         Args:
             user_id: The Discord user ID.
             user_name: The user's current display name.
+            all_stats: The stats loaded by the caller. New records are added
+                to this dict so they are saved along with it.
 
         Returns:
             An existing or new UserStats object.
         """
-        stats = await self.stats_repo.get_stats_for_user(user_id)
+        stats = all_stats.get(user_id)
         if stats is None:
             stats = UserStats(user_id=user_id, user_name=user_name)
-        stats.user_name = user_name
+            all_stats[user_id] = stats
+        stats.user_name = sys.intern(user_name)
         return stats
 
+    async def _update_leaderboard(self, *changed: UserStats):
+        """Reposition users on the leaderboard after their stats were saved."""
+        async with self._leaderboard_lock:
+            for stats in changed:
+                self._leaderboard.update(stats)
+
     async def record_eta(
         self, user_id: int, user_name: str, minutes: int = None, time_str: time = None
     ) -> UserETA:
@@ -68,22 +131,24 @@ class ReadyUpService:
 
         Returns:
             The UserETA object representing the user's new ETA.
+
+        Raises:
+            ValueError: If neither minutes nor time_str is provided.
         """
-        session = await self.session_repo.get_session()
-        if session is None:
-            session = Session()
+        if minutes is None and time_str is None:
+            raise ValueError("Either minutes or time_str must be provided.")
+        eta_kwargs = (
+            {"eta_minutes": minutes} if minutes is not None else {"eta_time": time_str}
+        )
 
-        if minutes:
-            eta = session.set_eta(
-                user_id=user_id, user_name=user_name, eta_minutes=minutes
-            )
-        else:
-            eta = session.set_eta(
-                user_id=user_id, user_name=user_name, eta_time=time_str
-            )
+        async with self._update_lock:
+            session = await self._load_session()
+            if session is None:
+                session = Session()
+            eta = session.set_eta(user_id=user_id, user_name=user_name, **eta_kwargs)
 
-        await self.session_repo.save_session(session)
-        return eta
+            await self._save_session(session)
+            return eta
 
     async def mark_as_arrived(self, user_id: int, user_name: str) -> UserETA:
         """
@@ -100,76 +165,106 @@ class ReadyUpService:
             KeyError: If the user has not set an ETA first.
             UserStateError: If the user's status is not 'EXPECTED'.
         """
-        session = await self.session_repo.get_session()
-        if not session:
-            raise KeyError("No active session found.")
+        async with self._update_lock:
+            session = await self._load_session()
+            if not session:
+                raise KeyError("No active session found.")
+
+            # Load the stats before touching the cached session, so a failed
+            # read leaves the user expected and /arrived can simply be retried.
+            all_stats = await self.stats_repo.get_all_stats()
+            stats = self._get_or_create_user_stats(user_id, user_name, all_stats)
+
+            arrived_eta = session.mark_arrived(user_id)
+            session.remove_user(user_id)
+            stats.record_arrival(arrived_eta)
+            await self.stats_repo.save_stats(all_stats)
+            await self._update_leaderboard(stats)
+            await self._save_session(session)
+            return arrived_eta
+
+    async def tick_session(self) -> SessionTick:
+        """
+        Run the periodic lateness and expiration checks on the active session.
 
-        arrived_eta = session.mark_arrived(user_id)
-        stats = await self._get_or_create_user_stats(user_id, user_name)
-        stats.record_arrival(arrived_eta)
-        all_stats = await self.stats_repo.get_all_stats()
-        all_stats[user_id] = stats
-        await self.stats_repo.save_stats(all_stats)
-        del session.users[user_id]
-        await self.session_repo.save_session(session)
-        return arrived_eta
+        The session is loaded once and both checks run against the same
+        object, so a tick costs a single session read.
 
-    async def check_for_late_users(self) -> List[UserETA]:
+        Returns:
+            A SessionTick with the users who just became late, the users
+            whose ETAs just expired, and when the next check is needed.
+        """
+        async with self._update_lock:
+            session = await self._load_session()
+            if not session:
+                return SessionTick()
+
+            now = get_aware_now()
+            newly_late = self._find_newly_late_users(session, now)
+            expired = await self._expire_etas(session, now)
+            return SessionTick(
+                newly_late=newly_late,
+                expired=expired,
+                next_due=session.next_deadline(),
+            )
+
+    def _find_newly_late_users(self, session: Session, now: datetime) -> List[UserETA]:
         """
         Find users whose ETA has passed within the last minute for notification.
 
+        Args:
+            session: The active session.
+            now: The reference time for this tick.
+
         Returns:
             A list of UserETA objects for users who just became late.
         """
-        session = await self.session_repo.get_session()
-        if not session:
-            return []
-
-        now = get_aware_now()
-        newly_late_users = []
-        for user_eta in session.users.values():
-            if (
-                user_eta.status == UserStatus.EXPECTED
-                and (now - timedelta(minutes=1)) < user_eta.arrival_timestamp <= now
-            ):
-                newly_late_users.append(user_eta)
-        return newly_late_users
-
-    async def check_and_expire_etas(self) -> List[UserETA]:
+        window_start = now - timedelta(minutes=1)
+        return [
+            user_eta
+            for user_eta in session.pop_due_etas(now)
+            if user_eta.arrival_timestamp > window_start
+        ]
+
+    async def _expire_etas(self, session: Session, now: datetime) -> List[UserETA]:
         """
-        Check for and expire overdue ETAs, immediately updating stats.
+        Expire overdue ETAs in the session, immediately updating stats.
+
+        Args:
+            session: The active session.
+            now: The reference time for this tick.
 
         Returns:
             A list of UserETA objects for users whose ETAs just expired.
         """
-        session = await self.session_repo.get_session()
-        if not session:
+        expired_ids = session.expired_user_ids(now.timestamp())
+        if not expired_ids:
             return []
 
-        users_to_check = list(session.users.keys())
-        expired_users_info = []
-        stats_changed = False
-
-        for user_id in users_to_check:
+        # Read the stats once and write them once per sweep, no matter how
+        # many users expired in it.
+        all_stats = await self.stats_repo.get_all_stats()
+        expired_users_info: List[UserETA] = []
+        for user_id in expired_ids:
+            # Re-check each user, in case they arrived or left meanwhile.
             user_eta = session.users.get(user_id)
-            if not user_eta or user_eta.status != UserStatus.EXPECTED:
+            if user_eta is None or user_eta.status != UserStatus.EXPECTED:
                 continue
+            session.remove_user(user_id)
+            user_eta.status = UserStatus.EXPIRED
+            stats = self._get_or_create_user_stats(
+                user_eta.user_id, user_eta.user_name, all_stats
+            )
+            stats.record_no_show()
+            expired_users_info.append(user_eta)
+        if not expired_users_info:
+            return []
 
-            if user_eta.should_expire():
-                user_eta.status = UserStatus.EXPIRED
-                expired_users_info.append(user_eta)
-                stats = await self._get_or_create_user_stats(
-                    user_eta.user_id, user_eta.user_name
-                )
-                stats.record_no_show()
-                all_stats = await self.stats_repo.get_all_stats()
-                all_stats[user_id] = stats
-                await self.stats_repo.save_stats(all_stats)
-                stats_changed = True
-                del session.users[user_id]
-
-        if stats_changed:
-            await self.session_repo.save_session(session)
+        await self.stats_repo.save_stats(all_stats)
+        await self._update_leaderboard(
+            *(all_stats[user_eta.user_id] for user_eta in expired_users_info)
+        )
+        await self._save_session(session)
         return expired_users_info
 
     async def archive_session_if_inactive(self) -> bool:
@@ -179,29 +274,35 @@ class ReadyUpService:
         Returns:
             True if the session was cleared, False otherwise.
         """
-        session = await self.session_repo.get_session()
-        if session and not session.users and session.is_inactive():
-            log.info("Empty session is inactive, clearing session file.")
-            await self.session_repo.clear_session()
-            return True
-        return False
+        async with self._update_lock:
+            session = await self._load_session()
+            if session and not session.users and session.is_inactive():
+                log.info("Empty session is inactive, clearing session file.")
+                self._session_cache = None
+                await self.session_repo.clear_session()
+                return True
+            return False
 
     async def get_session_status(self) -> Union[Session, None]:
         """Retrieve the current state of the active session."""
-        return await self.session_repo.get_session()
+        return await self._load_session()
 
     async def get_user_stats(self, user_id: int) -> Union[UserStats, None]:
         """Retrieve the long-term statistics for a specific user."""
         return await self.stats_repo.get_stats_for_user(user_id)
 
-    async def get_leaderboard(self) -> list[UserStats]:
-        """Retrieve all user stats, sorted for a leaderboard display."""
-        all_stats = await self.stats_repo.get_all_stats()
-        return sorted(
-            all_stats.values(),
-            key=lambda s: (
-                s.no_shows,
-                -s.on_time_percentage,
-                s.average_lateness_seconds,
-            ),
-        )
+    async def get_leaderboard(self, limit: int = 10) -> list[UserStats]:
+        """
+        Retrieve the top-ranked user stats for a leaderboard display.
+
+        The ranking is loaded from the repository once and then kept up to
+        date as stats are saved, so this does not re-read or re-sort the
+        stats on every call.
+
+        Args:
+            limit: The maximum number of users to return.
+        """
+        async with self._leaderboard_lock:
+            if not self._leaderboard.loaded:
+                self._leaderboard.load(await self.stats_repo.get_all_stats())
+            return self._leaderboard.top(limit)
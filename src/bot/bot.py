@@ -51,14 +51,19 @@ class ReadyUpBot(commands.Bot):
         await self.add_cog(ReadyUpCog(self, self.service))
         log.info("Cogs loaded.")
 
+    async def close(self):
+        """Write any pending application state before disconnecting from Discord."""
+        await self.service.close()
+        await super().close()
+
     async def on_ready(self):
         """Handle events when the bot is fully connected and ready.
 
         This is the correct and safest place to sync application commands,
-        as the bot's internal cache is guaranteed to be populated.
+        as the bot's internal cache is guaranteed to be populated. Discord
+        fires this event again after every reconnect, so it only does work
+        that is guarded to run once.
         """
-        await self.wait_until_ready()
-
         if not self.synced:
             try:
                 if settings.GUILD_ID:
@@ -7,22 +7,71 @@ responsible for formatting responses and managing background tasks related
 to the bot's operation.
 """
 
+import asyncio
 import logging
 import re
-from datetime import time, datetime, timedelta
-from typing import Union
+from datetime import time
+from typing import Dict, Iterable, List, Tuple, Union
 
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
 
 from application.services import ReadyUpService
-from config import settings
-from domain.models import UserStatus, UserStateError
+from domain.models import UserETA, UserStatus, UserStateError, get_aware_now
 
 log = logging.getLogger(__name__)
 TIME_RE = re.compile(r"^([0-1]?[0-9]|2[0-3]):([0-5][0-9])$")
 
+# Notification templates for the background tasks. Only formatted once a
+# user actually needs to be notified.
+LATE_NOTICE = (
+    "⏰ {mention}, your ETA of **<t:{timestamp}:t>** has passed. You are now late!"
+)
+EXPIRED_NOTICE = "⌛ {mention}, your ETA has expired and is now marked as a no-show."
+# Reply templates for /arrived.
+ARRIVED_ON_TIME_REPLY = "✅ **{mention} has arrived!** *(You are on time!)*"
+ARRIVED_LATE_REPLY = "✅ **{mention} has arrived!** *(You were {lateness} late.)*"
+# Bounds on how long the session tick sleeps before the next deadline.
+MIN_TICK_INTERVAL_SECONDS = 1.0
+MAX_TICK_INTERVAL_MINUTES = 10.0
+# Discord rejects messages longer than this many characters.
+MAX_MESSAGE_LENGTH = 2000
+
+
+def parse_hhmm(value: str) -> Union[time, None]:
+    """
+    Parse a 24-hour "HH:MM" string into a time, returning None if it is invalid.
+
+    The usual fixed-width form is decoded directly from its characters. Other
+    forms, such as a single-digit hour or surrounding whitespace, fall back
+    to TIME_RE.
+    """
+    if (
+        len(value) == 5
+        and value[2] == ":"
+        and value.isascii()
+        and value[:2].isdigit()
+        and value[3:].isdigit()
+    ):
+        hour = (ord(value[0]) - 48) * 10 + ord(value[1]) - 48
+        minute = (ord(value[3]) - 48) * 10 + ord(value[4]) - 48
+        if hour < 24 and minute < 60:
+            return time(hour=hour, minute=minute)
+        return None
+
+    match = TIME_RE.match(value.strip())
+    if not match:
+        return None
+    return time(hour=int(match.group(1)), minute=int(match.group(2)))
+
+
+def format_duration(seconds: int) -> str:
+    """Format a number of seconds as H:MM:SS."""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}"
+
 
 class ReadyUpCog(commands.Cog):
     """A Cog that encapsulates all commands and tasks for the ReadyUp bot."""
@@ -38,54 +87,141 @@ class ReadyUpCog(commands.Cog):
         self.bot = bot
         self.service = service
         self.notification_channel: Union[discord.TextChannel, None] = None
+        self._help_embed: Union[discord.Embed, None] = None
         log.info("ReadyUpCog loaded.")
 
-        self.check_lateness_task.start()
-        self.expire_etas_task.start()
+        self.session_tick_task.start()
         self.session_archival_task.start()
 
     def cog_unload(self):
         """Clean up by stopping all background tasks when the cog is unloaded."""
-        self.check_lateness_task.cancel()
-        self.expire_etas_task.cancel()
+        self.session_tick_task.cancel()
         self.session_archival_task.cancel()
         log.info("ReadyUpCog unloaded and tasks cancelled.")
 
+    def _resolve_mentions(
+        self,
+        guild: Union[discord.Guild, None],
+        users: Iterable[Tuple[int, str]],
+    ) -> Dict[int, str]:
+        """
+        Resolve mention strings for a batch of users in a single pass.
+
+        Users are looked up in the guild's member cache, or in the bot's user
+        cache outside a guild. Anyone who cannot be found is shown by their
+        stored name instead.
+
+        Args:
+            guild: The guild the command was used in, if any.
+            users: (user_id, fallback_name) pairs to resolve.
+
+        Returns:
+            A mapping of user ID to the string to display for that user.
+        """
+        lookup = guild.get_member if guild else self.bot.get_user
+        mentions = {}
+        for user_id, fallback_name in users:
+            user = lookup(user_id)
+            mentions[user_id] = user.mention if user else fallback_name
+        return mentions
+
+    def _schedule_session_tick(self, due: Union[float, None]):
+        """
+        Set the session tick to run next at the given deadline.
+
+        The tick sleeps until something is actually due instead of polling
+        every minute. The delay is capped at MAX_TICK_INTERVAL_MINUTES so
+        that the session is still checked now and then while nothing is due.
+
+        Args:
+            due: The deadline as Unix epoch seconds, or None if nothing is due.
+        """
+        loop = self.session_tick_task
+        next_run = loop.next_iteration
+        if next_run is None:
+            return
+        # Relative loops schedule the next run from the start of the last
+        # one, so the new interval is measured from there.
+        current = loop.hours * 3600 + loop.minutes * 60 + loop.seconds
+        last_run = next_run.timestamp() - current
+        max_interval = MAX_TICK_INTERVAL_MINUTES * 60
+        if due is None:
+            interval = max_interval
+        else:
+            interval = min(max(due - last_run, MIN_TICK_INTERVAL_SECONDS), max_interval)
+        if interval != current:
+            # Rescheduling also shortens the sleep the loop is currently in.
+            loop.change_interval(seconds=interval)
+
+    def _wake_session_tick(self, user_eta: UserETA):
+        """Bring the session tick forward if a new ETA falls before its next run."""
+        next_run = self.session_tick_task.next_iteration
+        due = user_eta.arrival_timestamp.timestamp()
+        if next_run is not None and due < next_run.timestamp():
+            self._schedule_session_tick(due)
+
+    async def _send_notifications(self, lines: List[str]):
+        """
+        Send notification lines to the notification channel in as few messages as possible.
+
+        When many users share an ETA their notices all fire on the same tick.
+        Packing them into messages up to Discord's length limit keeps the bot
+        to a single request per burst instead of one per user, and any
+        overflow messages are sent concurrently.
+
+        Args:
+            lines: The individual notification lines to deliver.
+        """
+        messages: List[str] = []
+        chunk: List[str] = []
+        length = 0
+        for line in lines:
+            if chunk and length + len(line) + 1 > MAX_MESSAGE_LENGTH:
+                messages.append("\n".join(chunk))
+                chunk, length = [], 0
+            chunk.append(line)
+            length += len(line) + 1
+        if chunk:
+            messages.append("\n".join(chunk))
+
+        # Send all messages concurrently so their round-trips overlap, and
+        # report failures individually instead of aborting the rest.
+        results = await asyncio.gather(
+            *(self.notification_channel.send(message) for message in messages),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                log.error(f"Failed to send notification: {result}", exc_info=result)
+
     # --- Background Tasks ---
 
-    @tasks.loop(minutes=1.0)
-    async def check_lateness_task(self):
-        """Periodically check for users who have just become late and notify them."""
+    @tasks.loop(minutes=MAX_TICK_INTERVAL_MINUTES)
+    async def session_tick_task(self):
+        """Notify users who just became late and expire overdue ETAs as they fall due."""
         try:
-            newly_late_users = await self.service.check_for_late_users()
-            if not newly_late_users or not self.notification_channel:
+            tick = await self.service.tick_session()
+            self._schedule_session_tick(tick.next_due)
+            if not self.notification_channel:
                 return
 
-            for eta in newly_late_users:
+            lines = []
+            for eta in tick.newly_late:
                 user = self.bot.get_user(eta.user_id)
                 if user:
-                    await self.notification_channel.send(
-                        f"⏰ {user.mention}, your ETA of **<t:{int(eta.arrival_timestamp.timestamp())}:t>** has passed. You are now late!"
+                    lines.append(
+                        LATE_NOTICE.format(
+                            mention=user.mention,
+                            timestamp=eta.unix_arrival,
+                        )
                     )
-        except Exception as e:
-            log.error(f"Error in check_lateness_task: {e}", exc_info=True)
-
-    @tasks.loop(minutes=1.0)
-    async def expire_etas_task(self):
-        """Periodically check for ETAs that have passed the expiration threshold."""
-        try:
-            expired_users = await self.service.check_and_expire_etas()
-            if not expired_users or not self.notification_channel:
-                return
-
-            for eta in expired_users:
+            for eta in tick.expired:
                 user = self.bot.get_user(eta.user_id)
                 if user:
-                    await self.notification_channel.send(
-                        f"⌛ {user.mention}, your ETA has expired and is now marked as a no-show."
-                    )
+                    lines.append(EXPIRED_NOTICE.format(mention=user.mention))
+            await self._send_notifications(lines)
         except Exception as e:
-            log.error(f"Error in expire_etas_task: {e}", exc_info=True)
+            log.error(f"Error in session_tick_task: {e}", exc_info=True)
 
     @tasks.loop(minutes=15.0)
     async def session_archival_task(self):
@@ -116,6 +252,12 @@ class ReadyUpCog(commands.Cog):
     )
     async def help(self, interaction: discord.Interaction):
         """Handle the /help command."""
+        if self._help_embed is None:
+            self._help_embed = self._build_help_embed()
+        await interaction.response.send_message(embed=self._help_embed, ephemeral=True)
+
+    def _build_help_embed(self) -> discord.Embed:
+        """Build the /help embed, which never changes while the bot is running."""
         embed = discord.Embed(
             title="ReadyUp Bot Help",
             description="I help coordinate sessions by tracking everyone's arrival time!",
@@ -142,7 +284,7 @@ class ReadyUpCog(commands.Cog):
             inline=False,
         )
         embed.set_footer(text="ReadyUp Bot | Let's get gaming!")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        return embed
 
     @app_commands.command(name="eta", description="Set your estimated time of arrival.")
     @app_commands.describe(
@@ -157,6 +299,7 @@ class ReadyUpCog(commands.Cog):
     ):
         """Handle the /eta command."""
         await interaction.response.defer()
+        author = interaction.user
 
         if self.notification_channel is None:
             self.notification_channel = interaction.channel
@@ -171,23 +314,23 @@ class ReadyUpCog(commands.Cog):
         try:
             parsed_time = None
             if time_str:
-                match = TIME_RE.match(time_str)
-                if not match:
+                parsed_time = parse_hhmm(time_str)
+                if parsed_time is None:
                     await interaction.followup.send(
                         "Invalid time format. Please use `HH:MM` (e.g., `21:30`).",
                         ephemeral=True,
                     )
                     return
-                parsed_time = time(hour=int(match.group(1)), minute=int(match.group(2)))
 
             user_eta = await self.service.record_eta(
-                user_id=interaction.user.id,
-                user_name=interaction.user.display_name,
+                user_id=author.id,
+                user_name=author.display_name,
                 minutes=minutes,
                 time_str=parsed_time,
             )
+            self._wake_session_tick(user_eta)
 
-            msg = f"Got it, {interaction.user.mention}! ETA set for **<t:{int(user_eta.arrival_timestamp.timestamp())}:t>**."
+            msg = f"Got it, {author.mention}! ETA set for **<t:{user_eta.unix_arrival}:t>**."
             await interaction.followup.send(msg)
         except Exception as e:
             log.error(f"Error processing /eta command: {e}", exc_info=True)
@@ -201,29 +344,29 @@ class ReadyUpCog(commands.Cog):
     async def arrived(self, interaction: discord.Interaction):
         """Handle the /arrived command, enforcing state rules."""
         await interaction.response.defer()
+        author = interaction.user
         try:
             user_eta = await self.service.mark_as_arrived(
-                interaction.user.id, interaction.user.display_name
+                author.id, author.display_name
             )
 
-            msg_parts = [f"✅ **{interaction.user.mention} has arrived!**"]
             if user_eta.is_late:
-                lateness_str = str(timedelta(seconds=user_eta.lateness_seconds)).split(
-                    "."
-                )[0]
-                msg_parts.append(f"*(You were {lateness_str} late.)*")
+                msg = ARRIVED_LATE_REPLY.format(
+                    mention=author.mention,
+                    lateness=format_duration(user_eta.lateness_seconds),
+                )
             else:
-                msg_parts.append("*(You are on time!)*")
-            await interaction.followup.send(" ".join(msg_parts))
+                msg = ARRIVED_ON_TIME_REPLY.format(mention=author.mention)
+            await interaction.followup.send(msg)
 
         except UserStateError:
             await interaction.followup.send(
-                f"Hey {interaction.user.mention}, you have already been marked as 'arrived' or 'expired' for this session.",
+                f"Hey {author.mention}, you have already been marked as 'arrived' or 'expired' for this session.",
                 ephemeral=True,
             )
         except KeyError:
             await interaction.followup.send(
-                f"Hey {interaction.user.mention}, you need to set an ETA with `/eta` before you can arrive!",
+                f"Hey {author.mention}, you need to set an ETA with `/eta` before you can arrive!",
                 ephemeral=True,
             )
         except Exception as e:
@@ -248,49 +391,54 @@ class ReadyUpCog(commands.Cog):
         embed = discord.Embed(
             title="Current Session Status",
             color=discord.Color.blue(),
-            timestamp=datetime.now(settings.TIMEZONE),
+            timestamp=get_aware_now(),
+        )
+        mentions = self._resolve_mentions(
+            interaction.guild,
+            ((u.user_id, u.user_name) for u in session.users.values()),
         )
+        # Bucket users by status in ETA order, for a predictable display.
         arrived, expected, expired = [], [], []
-
-        def sort_key(u):
-            # Sort users by status, then by their ETA, for a predictable display.
-            return (
-                {
-                    UserStatus.ARRIVED: 0,
-                    UserStatus.EXPECTED: 1,
-                    UserStatus.EXPIRED: 2,
-                }.get(u.status, 99),
-                u.arrival_timestamp,
-            )
-
-        for u_eta in sorted(session.users.values(), key=sort_key):
-            user = self.bot.get_user(u_eta.user_id) or u_eta.user_name
-            mention = user.mention if hasattr(user, "mention") else u_eta.user_name
+        for u_eta in sorted(session.users.values(), key=lambda u: u.arrival_timestamp):
             if u_eta.status == UserStatus.ARRIVED:
-                l_str = (
-                    f" (Late by {str(timedelta(seconds=u_eta.lateness_seconds)).split('.')[0]})"
-                    if u_eta.is_late
-                    else ""
-                )
-                arrived.append(
-                    f"✅ {mention} (Arrived at <t:{int(u_eta.actual_arrival_time.timestamp())}:t>{l_str})"
-                )
+                arrived.append(u_eta)
             elif u_eta.status == UserStatus.EXPIRED:
-                expired.append(
-                    f"❌ {mention} (ETA <t:{int(u_eta.arrival_timestamp.timestamp())}:t> expired)"
-                )
+                expired.append(u_eta)
             else:
-                expected.append(
-                    f"⏳ {mention} (ETA: <t:{int(u_eta.arrival_timestamp.timestamp())}:R>)"
-                )
+                expected.append(u_eta)
 
         if arrived:
-            embed.add_field(name="Arrived", value="\n".join(arrived), inline=False)
+            embed.add_field(
+                name="Arrived",
+                value="\n".join(
+                    f"✅ {mentions[u.user_id]} (Arrived at <t:{u.unix_actual}:t>"
+                    + (
+                        f" (Late by {format_duration(u.lateness_seconds)})"
+                        if u.is_late
+                        else ""
+                    )
+                    + ")"
+                    for u in arrived
+                ),
+                inline=False,
+            )
         if expected:
-            embed.add_field(name="Expected", value="\n".join(expected), inline=False)
+            embed.add_field(
+                name="Expected",
+                value="\n".join(
+                    f"⏳ {mentions[u.user_id]} (ETA: <t:{u.unix_arrival}:R>)"
+                    for u in expected
+                ),
+                inline=False,
+            )
         if expired:
             embed.add_field(
-                name="ETA Expired (No-Show)", value="\n".join(expired), inline=False
+                name="ETA Expired (No-Show)",
+                value="\n".join(
+                    f"❌ {mentions[u.user_id]} (ETA <t:{u.unix_arrival}:t> expired)"
+                    for u in expired
+                ),
+                inline=False,
             )
 
         embed.set_footer(
@@ -327,7 +475,6 @@ class ReadyUpCog(commands.Cog):
             name="On-Time %", value=f"{stats_data.on_time_percentage:.2f}%", inline=True
         )
         embed.add_field(name="No-Shows", value=str(stats_data.no_shows), inline=True)
-        avg_lateness = timedelta(seconds=stats_data.average_lateness_seconds)
         embed.add_field(
             name="Total Late Arrivals",
             value=str(stats_data.late_arrivals),
@@ -335,7 +482,7 @@ class ReadyUpCog(commands.Cog):
         )
         embed.add_field(
             name="Avg. Lateness (when late)",
-            value=str(avg_lateness).split(".")[0],
+            value=format_duration(stats_data.average_lateness_seconds),
             inline=True,
         )
         await interaction.followup.send(embed=embed)
@@ -347,8 +494,8 @@ class ReadyUpCog(commands.Cog):
     async def leaderboard(self, interaction: discord.Interaction):
         """Handle the /leaderboard command."""
         await interaction.response.defer()
-        leaderboard_stats = await self.service.get_leaderboard()
-        if not leaderboard_stats:
+        top_stats = await self.service.get_leaderboard(limit=10)
+        if not top_stats:
             await interaction.followup.send(
                 "No stats have been recorded yet to generate a leaderboard."
             )
@@ -359,11 +506,13 @@ class ReadyUpCog(commands.Cog):
             description="Ranked by no-shows, then on-time percentage.",
             color=discord.Color.gold(),
         )
+        mentions = self._resolve_mentions(
+            interaction.guild, ((s.user_id, s.user_name) for s in top_stats)
+        )
         board_text = []
-        for i, s in enumerate(leaderboard_stats[:10]):
+        for i, s in enumerate(top_stats):
             rank_emoji = {0: "🥇", 1: "🥈", 2: "🥉"}.get(i, f"**#{i + 1}**")
-            user = self.bot.get_user(s.user_id) or s.user_name
-            mention = user.mention if hasattr(user, "mention") else s.user_name
+            mention = mentions[s.user_id]
             board_text.append(
                 f"{rank_emoji} {mention} - **{s.on_time_percentage:.1f}%** on-time | **{s.no_shows}** no-shows"
             )
@@ -7,19 +7,33 @@ configurable parameters throughout the application.
 """
 
 import logging
-import sys
+from functools import cache, lru_cache
 from pathlib import Path
-from typing import Any, List, Union
-from datetime import tzinfo
+from typing import Annotated, Any, Union
+from datetime import timezone, tzinfo
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-import pytz
-from dotenv import load_dotenv
 from pydantic import Field, field_validator
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 log = logging.getLogger(__name__)
-load_dotenv()
+
+# The .env file lives in the project root, next to the src directory. It is
+# located from this file so the bot finds it regardless of the working directory.
+ENV_FILE = Path(__file__).resolve().parent.parent / ".env"
+
+
+@cache
+def _resolve_timezone(name: str) -> tzinfo:
+    """Look up a timezone by name, falling back to UTC if it cannot be found."""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        log.error(
+            f"Timezone '{name}' is not valid. "
+            "Falling back to UTC. Please check your .env file."
+        )
+        return timezone.utc
 
 
 class Settings(BaseSettings):
@@ -27,31 +41,42 @@ class Settings(BaseSettings):
 
     DISCORD_TOKEN: str
     GUILD_ID: Union[int, None] = None
-    ADMIN_ROLE_IDS: List[int] = Field(default_factory=list)
+    # NoDecode hands the raw env string to the validator below, instead of
+    # pydantic-settings first trying (and failing) to parse it as JSON.
+    ADMIN_ROLE_IDS: Annotated[frozenset[int], NoDecode] = Field(
+        default_factory=frozenset
+    )
     DEFAULT_TIMEZONE: str = "Europe/Stockholm"
     DATA_DIR: str = "data"
     ETA_EXPIRATION_MINUTES: int = 60
     SESSION_INACTIVITY_TIMEOUT_HOURS: int = 3
+    DEBUG_JSON: bool = False
 
-    _timezone_cache: Union[tzinfo, None] = None
+    _timezone: tzinfo | None = None
 
     @field_validator("ADMIN_ROLE_IDS", mode="before")
     @classmethod
-    def _parse_comma_separated_ints(cls, v: Any) -> list[int]:
-        """Parse a comma-separated string of IDs from an env var into a list of ints."""
+    def _parse_comma_separated_ints(cls, v: Any) -> frozenset[int]:
+        """Parse role IDs from an env var into a frozenset for constant-time lookups."""
         if v is None:
-            return []
+            return frozenset()
         if isinstance(v, str):
+            # Accept both "1,2" and the JSON-style "[1,2]" form.
+            v = v.strip().strip("[]")
             if not v.strip():
-                return []
+                return frozenset()
             try:
-                return [int(id_str.strip()) for id_str in v.split(",")]
+                if "," not in v:
+                    return frozenset((int(v),))
+                return frozenset(
+                    int(id_str) for id_str in v.split(",") if id_str.strip()
+                )
             except (ValueError, TypeError):
                 log.error(f"Could not parse ADMIN_ROLE_IDS='{v}'.")
-                return []
-        if isinstance(v, list):
-            return v
-        return []
+                return frozenset()
+        if isinstance(v, (list, tuple, set, frozenset)):
+            return frozenset(v)
+        return frozenset()
 
     @property
     def data_dir_path(self) -> Path:
@@ -60,40 +85,26 @@ class Settings(BaseSettings):
         path.mkdir(exist_ok=True)
         return path
 
+    def model_post_init(self, __context: Any):
+        """Resolve the configured timezone once, after the fields are validated."""
+        self._timezone = _resolve_timezone(self.DEFAULT_TIMEZONE)
+
     @property
     def timezone_info(self) -> tzinfo:
-        """Return a timezone object, caching the result after the first lookup."""
-        if self._timezone_cache is None:
-            try:
-                self._timezone_cache = ZoneInfo(self.DEFAULT_TIMEZONE)
-            except ZoneInfoNotFoundError:
-                # The 'tzdata' package is often missing on non-Linux systems.
-                # In this case, ZoneInfo is expected to fail and can safely fall back.
-                if "linux" not in sys.platform:
-                    log.warning(
-                        f"Could not find timezone '{self.DEFAULT_TIMEZONE}' using 'zoneinfo'. "
-                        "This is expected on non-Linux systems. Falling back to 'pytz'."
-                    )
-                else:
-                    log.error(
-                        f"CRITICAL: Could not find timezone '{self.DEFAULT_TIMEZONE}' on Linux!"
-                    )
-
-                try:
-                    self._timezone_cache = pytz.timezone(self.DEFAULT_TIMEZONE)
-                except pytz.UnknownTimeZoneError:
-                    log.error(
-                        f"Timezone '{self.DEFAULT_TIMEZONE}' is not valid. "
-                        "Falling back to UTC. Please check your .env file."
-                    )
-                    self._timezone_cache = pytz.utc
-        return self._timezone_cache
+        """Return the timezone resolved when the settings were loaded."""
+        return self._timezone
 
     model_config = SettingsConfigDict(
-        env_file=".env",
+        env_file=ENV_FILE,
         env_file_encoding="utf-8",
         case_sensitive=False,
     )
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the application settings, reading the environment only once."""
+    return Settings()
+
+
+settings = get_settings()
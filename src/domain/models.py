@@ -7,22 +7,31 @@ and statistics. It is designed to be completely independent of the
 presentation (Discord) and infrastructure (persistence) layers.
 """
 
+import heapq
 import logging
+import sys
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta, time, timezone
-from enum import Enum
+from datetime import datetime, timedelta, time
+from enum import IntEnum
+from time import time as epoch_now
 
 from config import settings
 
 log = logging.getLogger(__name__)
 
+# The configured timezone, resolved once when the settings were loaded.
+_TZ = settings.timezone_info
+# Expiry and inactivity thresholds in seconds. The settings never change
+# at runtime, so these are computed once instead of on every check.
+ETA_EXPIRATION_SECONDS = settings.ETA_EXPIRATION_MINUTES * 60
+SESSION_INACTIVITY_SECONDS = settings.SESSION_INACTIVITY_TIMEOUT_HOURS * 3600
+
 
 def get_aware_now() -> datetime:
     """Return the current time as a timezone-aware datetime object."""
-    # This two-step process is the most robust way to handle timezones.
-    # It gets the current time in universal UTC, then converts it to the
-    # configured local timezone, avoiding all naive datetime issues.
-    return datetime.now(timezone.utc).astimezone(settings.timezone_info)
+    # datetime.now(tz) converts from UTC internally, so this yields the same
+    # instant as going through an explicit UTC datetime, minus the extra object.
+    return datetime.now(_TZ)
 
 
 class UserStateError(Exception):
@@ -36,15 +45,20 @@ class UserStateError(Exception):
     pass
 
 
-class UserStatus(Enum):
-    """Represents the finite states a user can be in during a session."""
+class UserStatus(IntEnum):
+    """
+    Represents the finite states a user can be in during a session.
+
+    Statuses are small integers so that comparisons are plain int compares
+    and they are stored compactly in the session file.
+    """
 
-    EXPECTED = "Expected"
-    ARRIVED = "Arrived"
-    EXPIRED = "Expired"
+    EXPECTED = 0
+    ARRIVED = 1
+    EXPIRED = 2
 
 
-@dataclass
+@dataclass(slots=True)
 class UserETA:
     """Represents a single user's arrival data for a session."""
 
@@ -55,6 +69,10 @@ class UserETA:
     status: UserStatus = UserStatus.EXPECTED
     actual_arrival_time: datetime | None = None
 
+    def __post_init__(self):
+        """Intern the name so a user's ETAs and stats share one string."""
+        self.user_name = sys.intern(self.user_name)
+
     @property
     def is_late(self) -> bool:
         """Determine if the user arrived after their stated ETA."""
@@ -70,15 +88,20 @@ class UserETA:
         lateness = self.actual_arrival_time - self.arrival_timestamp
         return max(0, int(lateness.total_seconds()))
 
-    def should_expire(self) -> bool:
-        """Determine if this ETA has passed the configured expiration threshold."""
-        if self.status != UserStatus.EXPECTED:
-            return False
-        expiration_threshold = timedelta(minutes=settings.ETA_EXPIRATION_MINUTES)
-        return get_aware_now() > (self.arrival_timestamp + expiration_threshold)
+    @property
+    def unix_arrival(self) -> int:
+        """Return the ETA as whole seconds since the Unix epoch."""
+        return int(self.arrival_timestamp.timestamp())
+
+    @property
+    def unix_actual(self) -> int | None:
+        """Return the actual arrival time as whole seconds since the Unix epoch."""
+        if self.actual_arrival_time is None:
+            return None
+        return int(self.actual_arrival_time.timestamp())
 
 
-@dataclass
+@dataclass(slots=True)
 class Session:
     """
     Encapsulates the state of a single group session.
@@ -86,15 +109,40 @@ class Session:
     A session is an implicitly created object that holds all users who are
     currently expected to arrive. Once a user arrives or their ETA expires,
     they are removed from the session.
+
+    ETAs should only be changed through set_eta, mark_arrived and
+    remove_user, which keep the session's ETA indexes up to date.
     """
 
     users: dict[int, UserETA] = field(default_factory=dict)
     start_time: datetime = field(default_factory=get_aware_now)
     last_activity_time: datetime = field(default_factory=get_aware_now)
-
-    def _update_activity_time(self):
-        """Update the session's last activity timestamp to the current time."""
-        self.last_activity_time = get_aware_now()
+    # Min-heap of (arrival_timestamp, user_id) for expected users. Entries
+    # that no longer match the user's current ETA are discarded lazily.
+    _eta_heap: list[tuple[datetime, int]] = field(
+        init=False, default_factory=list, repr=False, compare=False
+    )
+    # ETAs of expected users as Unix epoch seconds, so expiration sweeps
+    # compare plain floats instead of datetimes.
+    _expected_epochs: dict[int, float] = field(
+        init=False, default_factory=dict, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        """Build the ETA indexes from the users the session was created with."""
+        self._expected_epochs = {
+            uid: user_eta.arrival_timestamp.timestamp()
+            for uid, user_eta in self.users.items()
+            if user_eta.status == UserStatus.EXPECTED
+        }
+        self._eta_heap = [
+            (self.users[uid].arrival_timestamp, uid) for uid in self._expected_epochs
+        ]
+        heapq.heapify(self._eta_heap)
+
+    def _update_activity_time(self, now: datetime):
+        """Update the session's last activity timestamp to the given time."""
+        self.last_activity_time = now
 
     def set_eta(
         self,
@@ -135,7 +183,9 @@ class Session:
             arrival_timestamp=arrival_ts,
         )
         self.users[user_id] = user_eta
-        self._update_activity_time()
+        heapq.heappush(self._eta_heap, (arrival_ts, user_id))
+        self._expected_epochs[user_id] = arrival_ts.timestamp()
+        self._update_activity_time(now)
         return user_eta
 
     def mark_arrived(self, user_id: int) -> UserETA:
@@ -155,31 +205,119 @@ class Session:
             KeyError: If the user is not found in the session.
             UserStateError: If the user has already arrived or their ETA expired.
         """
-        if user_id not in self.users:
+        user_eta_instance = self.users.get(user_id)
+        if user_eta_instance is None:
             raise KeyError(f"User {user_id} not in session.")
 
-        user_eta_instance = self.users[user_id]
-
         if user_eta_instance.status != UserStatus.EXPECTED:
             raise UserStateError(
-                f"User {user_id} cannot arrive; their status is '{user_eta_instance.status.value}'."
+                f"User {user_id} cannot arrive; their status is '{user_eta_instance.status.name.title()}'."
             )
 
+        now = get_aware_now()
         user_eta_instance.status = UserStatus.ARRIVED
-        user_eta_instance.actual_arrival_time = get_aware_now()
-        self._update_activity_time()
+        user_eta_instance.actual_arrival_time = now
+        self._expected_epochs.pop(user_id, None)
+        self._update_activity_time(now)
 
         return user_eta_instance
 
-    def is_inactive(self) -> bool:
-        """Determine if the session has been inactive for longer than the timeout."""
-        inactivity_threshold = timedelta(
-            hours=settings.SESSION_INACTIVITY_TIMEOUT_HOURS
+    def remove_user(self, user_id: int) -> UserETA:
+        """
+        Remove a user from the session.
+
+        Args:
+            user_id: The Discord user ID of the user to remove.
+
+        Returns:
+            The removed user's UserETA object.
+
+        Raises:
+            KeyError: If the user is not found in the session.
+        """
+        self._expected_epochs.pop(user_id, None)
+        return self.users.pop(user_id)
+
+    def expired_user_ids(self, now_epoch: float) -> list[int]:
+        """
+        Return the IDs of expected users whose ETA is older than the threshold.
+
+        Args:
+            now_epoch: The reference time as Unix epoch seconds.
+
+        Returns:
+            The user IDs of still-expected users whose ETA has expired.
+        """
+        cutoff = now_epoch - ETA_EXPIRATION_SECONDS
+        return [uid for uid, ts in self._expected_epochs.items() if ts < cutoff]
+
+    def next_deadline(self) -> float | None:
+        """
+        Return when the session next needs checking, or None if it never does.
+
+        This is the earliest upcoming ETA, for lateness notices, or the
+        earliest point at which an expected user's ETA expires.
+
+        Returns:
+            The deadline as Unix epoch seconds, or None if nobody is expected.
+        """
+        deadlines = []
+        if self._eta_heap:
+            deadlines.append(self._eta_heap[0][0].timestamp())
+        if self._expected_epochs:
+            deadlines.append(
+                min(self._expected_epochs.values()) + ETA_EXPIRATION_SECONDS
+            )
+        return min(deadlines, default=None)
+
+    def pop_due_etas(self, now: datetime) -> list[UserETA]:
+        """
+        Remove and return the expected ETAs whose arrival time has been reached.
+
+        Only entries at the front of the heap are examined, so a call where
+        nobody is due does constant work. Entries for users who have since
+        arrived, expired, left the session or set a new ETA are dropped.
+
+        Args:
+            now: The reference time to compare arrival timestamps against.
+
+        Returns:
+            The UserETA objects of still-expected users whose ETA is due.
+        """
+        due = []
+        seen = set()
+        heap = self._eta_heap
+        while heap and heap[0][0] <= now:
+            arrival_ts, user_id = heapq.heappop(heap)
+            user_eta = self.users.get(user_id)
+            # Setting the same ETA twice pushes identical entries, so each
+            # user is only returned once.
+            if (
+                user_id not in seen
+                and user_eta is not None
+                and user_eta.status == UserStatus.EXPECTED
+                and user_eta.arrival_timestamp == arrival_ts
+            ):
+                seen.add(user_id)
+                due.append(user_eta)
+        return due
+
+    def is_inactive(self, now_epoch: float | None = None) -> bool:
+        """
+        Determine if the session has been inactive for longer than the timeout.
+
+        Args:
+            now_epoch: The reference time as Unix epoch seconds. Defaults to
+                the current time.
+        """
+        if now_epoch is None:
+            now_epoch = epoch_now()
+        return (
+            now_epoch > self.last_activity_time.timestamp() + SESSION_INACTIVITY_SECONDS
         )
-        return get_aware_now() > (self.last_activity_time + inactivity_threshold)
 
 
-@dataclass
+@dataclass(slots=True)
 class UserStats:
     """Stores and calculates long-term punctuality statistics for a user."""
 
@@ -191,6 +329,10 @@ class UserStats:
     late_arrivals: int = 0
     no_shows: int = 0
 
+    def __post_init__(self):
+        """Intern the name so a user's ETAs and stats share one string."""
+        self.user_name = sys.intern(self.user_name)
+
     def record_arrival(self, user_eta: UserETA):
         """
         Update stats for a user who has successfully arrived.
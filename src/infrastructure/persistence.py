@@ -6,19 +6,18 @@ implementations for the repository interfaces defined in the application
 layer, handling the specifics of reading from and writing to JSON files.
 """
 
-import json
 import logging
 import os
-import uuid
 from pathlib import Path
 from typing import Union, Dict
 from datetime import datetime
-from enum import Enum
 import asyncio
 
 import aiofiles
-from pydantic import BaseModel, ValidationError
+import orjson
+from pydantic import BaseModel, ValidationError, field_validator
 
+from config import settings
 from domain.models import Session, UserStats, UserETA, UserStatus
 
 log = logging.getLogger(__name__)
@@ -41,6 +40,14 @@ class PydanticUserETA(BaseModel):
     status: UserStatus
     actual_arrival_time: Union[datetime, None] = None
 
+    @field_validator("status", mode="before")
+    @classmethod
+    def _parse_legacy_status(cls, v):
+        """Accept the status names ("Expected", ...) written by older versions."""
+        if isinstance(v, str) and v.upper() in UserStatus.__members__:
+            return UserStatus[v.upper()]
+        return v
+
 
 class PydanticSession(BaseModel):
     """A Pydantic model for validating Session data from JSON."""
@@ -62,16 +69,36 @@ class PydanticUserStats(BaseModel):
     no_shows: int = 0
 
 
-class CustomJSONEncoder(json.JSONEncoder):
-    """A custom JSON encoder to handle non-standard types like datetimes and enums."""
+# Integer columns of a stored UserStats row. Rows whose values are all real
+# ints can be loaded without going through Pydantic.
+STATS_INT_FIELDS = (
+    "user_id",
+    "total_sessions",
+    "on_time_arrivals",
+    "total_lateness_seconds",
+    "late_arrivals",
+    "no_shows",
+)
+
+
+def _is_well_formed_stats_row(row) -> bool:
+    """Check that a stored stats row already has the types UserStats expects."""
+    return (
+        isinstance(row, dict)
+        and type(row.get("user_name")) is str
+        and all(type(row.get(name, 0)) is int for name in STATS_INT_FIELDS)
+    )
+
 
-    def default(self, o):
-        """Handle datetime and Enum objects during JSON serialization."""
-        if isinstance(o, datetime):
-            return o.isoformat()
-        if isinstance(o, Enum):
-            return o.value
-        return super().default(o)
+# orjson encodes dataclasses, datetimes (as ISO 8601) and enums natively.
+# Non-string keys are needed because users and stats are keyed by int ID.
+# Files are written compactly unless DEBUG_JSON asks for readable output.
+JSON_DUMP_OPTIONS = orjson.OPT_NON_STR_KEYS
+if settings.DEBUG_JSON:
+    JSON_DUMP_OPTIONS |= orjson.OPT_INDENT_2
+# How long session saves are held before being written, so that a burst
+# of commands results in a single write.
+SESSION_FLUSH_DELAY_SECONDS = 0.2
 
 
 class JsonRepository:
@@ -87,21 +114,27 @@ class JsonRepository:
         self._file_path = file_path
         self._file_path.parent.mkdir(parents=True, exist_ok=True)
         self._lock = asyncio.Lock()
+        self._write_seq = 0
 
     async def _read_file(self) -> Union[dict, None]:
-        """Read and decode the JSON file in a thread-safe manner."""
-        async with self._lock:
-            if not self._file_path.exists():
-                return None
-            try:
-                async with aiofiles.open(self._file_path, "r", encoding="utf-8") as f:
-                    content = await f.read()
-                    if not content:
-                        return None
-                    return json.loads(content)
-            except (IOError, json.JSONDecodeError) as e:
-                log.error(f"Error reading or decoding {self._file_path}: {e}")
-                return None
+        """Read and decode the JSON file."""
+        # Reads don't take the lock: writes replace the file atomically, so
+        # a reader always sees either the old or the new complete file.
+        try:
+            async with aiofiles.open(self._file_path, "rb") as f:
+                content = await f.read()
+        except FileNotFoundError:
+            return None
+        except IOError as e:
+            log.error(f"Error reading {self._file_path}: {e}")
+            return None
+        if not content:
+            return None
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError as e:
+            log.error(f"Error decoding {self._file_path}: {e}")
+            return None
 
     async def _write_file(self, data: dict):
         """Write data to the JSON file atomically and safely."""
@@ -109,32 +142,63 @@ class JsonRepository:
         # data corruption if the bot crashes mid-write. The asyncio lock
         # prevents race conditions between different bot tasks.
         async with self._lock:
-            temp_path = self._file_path.with_suffix(f".json.tmp.{uuid.uuid4()}")
+            # Writes are serialized by the lock, so a per-repository counter
+            # is unique within the process and the PID separates processes.
+            self._write_seq += 1
+            temp_path = self._file_path.with_suffix(
+                f".json.tmp.{os.getpid()}.{self._write_seq}"
+            )
             try:
-                async with aiofiles.open(temp_path, "w", encoding="utf-8") as f:
-                    await f.write(json.dumps(data, cls=CustomJSONEncoder, indent=2))
+                async with aiofiles.open(temp_path, "wb") as f:
+                    await f.write(orjson.dumps(data, option=JSON_DUMP_OPTIONS))
                 os.replace(temp_path, self._file_path)
+                temp_path = None
             except IOError as e:
                 log.error(f"Error writing to {self._file_path}: {e}")
             finally:
-                if temp_path.exists():
-                    os.remove(temp_path)
+                # A successful replace has already consumed the temp file, so
+                # it only needs removing when the write failed part-way.
+                if temp_path is not None:
+                    temp_path.unlink(missing_ok=True)
 
     async def _clear_file(self):
         """Safely remove the data file."""
         async with self._lock:
-            if self._file_path.exists():
-                try:
-                    os.remove(self._file_path)
-                except IOError as e:
-                    log.error(f"Error removing file {self._file_path}: {e}")
+            try:
+                self._file_path.unlink(missing_ok=True)
+            except IOError as e:
+                log.error(f"Error removing file {self._file_path}: {e}")
 
 
 class JsonSessionRepository(JsonRepository):
-    """A JSON file implementation of the SessionRepository interface."""
+    """
+    A JSON file implementation of the SessionRepository interface.
+
+    Saves are debounced: the latest session is kept in memory and written
+    once the flush delay has passed, so that a burst of saves results in a
+    single file write.
+    """
+
+    def __init__(
+        self, file_path: Path, flush_delay: float = SESSION_FLUSH_DELAY_SECONDS
+    ):
+        """
+        Initialize the repository.
+
+        Args:
+            file_path: The path to the JSON file this repository manages.
+            flush_delay: Seconds to wait after a save before writing the file.
+        """
+        super().__init__(file_path)
+        self._flush_delay = flush_delay
+        self._dirty: Union[Session, None] = None
+        self._flush_handle: Union[asyncio.TimerHandle, None] = None
+        self._flush_task: Union[asyncio.Task, None] = None
 
     async def get_session(self) -> Union[Session, None]:
         """Retrieve and validate the active session from its JSON file."""
+        if self._dirty is not None:
+            return self._dirty
         data = await self._read_file()
         if not data:
             return None
@@ -164,16 +228,68 @@ class JsonSessionRepository(JsonRepository):
             return None
 
     async def save_session(self, session: Session):
-        """Serialize and save the current session state to its JSON file."""
+        """Schedule the session to be written once the flush delay has passed."""
+        self._dirty = session
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self._flush_delay, self._start_flush
+            )
+
+    def _start_flush(self):
+        """Write the pending session from the event loop's timer callback."""
+        self._flush_handle = None
+        self._flush_task = asyncio.create_task(self._write_pending())
+
+    async def flush(self):
+        """Write the pending session, if any, and wait for all writes to finish."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        # A timer-started write may still be in progress, and the caller
+        # (e.g. shutdown) needs it on disk before continuing.
+        await self._wait_for_flush_task()
+        await self._write_pending()
+        await self._wait_for_flush_task()
+
+    async def _wait_for_flush_task(self):
+        """Wait for a timer-started write, if one is running, to complete."""
+        task = self._flush_task
+        if task is not None:
+            await task
+            if self._flush_task is task:
+                self._flush_task = None
+
+    async def _write_pending(self):
+        """Take the pending session, if any, and write it to its JSON file."""
+        session, self._dirty = self._dirty, None
+        if session is None:
+            return
+        try:
+            await self._write_session(session)
+        except Exception as e:
+            log.error(
+                f"Error flushing session to {self._file_path}: {e}", exc_info=True
+            )
+
+    async def _write_session(self, session: Session):
+        """Serialize and save the given session state to its JSON file."""
         data = {
             "start_time": session.start_time,
             "last_activity_time": session.last_activity_time,
-            "users": {uid: eta.__dict__ for uid, eta in session.users.items()},
+            # orjson serializes the UserETA dataclasses directly.
+            "users": session.users,
         }
         await self._write_file(data)
 
     async def clear_session(self):
-        """Delete the active session file."""
+        """Discard any pending save and delete the active session file."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._dirty = None
+        # A flush that is already writing must finish first, or it could
+        # recreate the file after it has been removed.
+        await self._wait_for_flush_task()
         await self._clear_file()
 
 
@@ -188,8 +304,18 @@ class JsonStatsRepository(JsonRepository):
         try:
             domain_stats = {}
             for uid, stats_data in data.items():
-                pydantic_stat = PydanticUserStats.model_validate(stats_data)
-                domain_stats[int(uid)] = UserStats(**pydantic_stat.model_dump())
+                # Rows written by this repository map directly onto UserStats,
+                # so Pydantic is only needed for rows with wrong types or keys.
+                stats = None
+                if _is_well_formed_stats_row(stats_data):
+                    try:
+                        stats = UserStats(**stats_data)
+                    except TypeError:
+                        pass
+                if stats is None:
+                    pydantic_stat = PydanticUserStats.model_validate(stats_data)
+                    stats = UserStats(**pydantic_stat.model_dump())
+                domain_stats[int(uid)] = stats
             return domain_stats
         except ValidationError as e:
             log.error(f"User stats validation failed in {self._file_path}. Error: {e}")
@@ -202,5 +328,4 @@ class JsonStatsRepository(JsonRepository):
 
     async def save_stats(self, stats: Dict[int, UserStats]):
         """Serialize and save all user statistics to the JSON file."""
-        data = {uid: s.__dict__ for uid, s in stats.items()}
-        await self._write_file(data)
+        await self._write_file(stats)